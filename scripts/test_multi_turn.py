@@ -17,12 +17,10 @@ def test_multi_turn() -> None:
     try:
         # Turn 1
         print("\n[Turn 1] User asks about Python")
-        response1 = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "user", "content": "What is Python? Answer in one sentence."},
-            ],
-        )
+        messages = [
+            {"role": "user", "content": "What is Python? Answer in one sentence."},
+        ]
+        response1 = client.chat.completions.create(model=model, messages=messages)
         content1 = response1.choices[0].message.content
         print(f"Assistant: {content1}")
 
@@ -30,17 +28,11 @@ def test_multi_turn() -> None:
 
         # Turn 2
         print("\n[Turn 2] User asks a follow-up question")
-        response2 = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "user", "content": "What is Python? Answer in one sentence."},
-                {"role": "assistant", "content": content1},
-                {
-                    "role": "user",
-                    "content": "Is it easy to learn? Answer in one sentence.",
-                },
-            ],
+        messages.append({"role": "assistant", "content": content1})
+        messages.append(
+            {"role": "user", "content": "Is it easy to learn? Answer in one sentence."}
         )
+        response2 = client.chat.completions.create(model=model, messages=messages)
         content2 = response2.choices[0].message.content
         print(f"Assistant: {content2}")
 
@@ -48,22 +40,14 @@ def test_multi_turn() -> None:
 
         # Turn 3
         print("\n[Turn 3] User asks another follow-up question")
-        response3 = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "user", "content": "What is Python? Answer in one sentence."},
-                {"role": "assistant", "content": content1},
-                {
-                    "role": "user",
-                    "content": "Is it easy to learn? Answer in one sentence.",
-                },
-                {"role": "assistant", "content": content2},
-                {
-                    "role": "user",
-                    "content": "What are its main uses? Answer in one sentence.",
-                },
-            ],
+        messages.append({"role": "assistant", "content": content2})
+        messages.append(
+            {
+                "role": "user",
+                "content": "What are its main uses? Answer in one sentence.",
+            }
         )
+        response3 = client.chat.completions.create(model=model, messages=messages)
         print(f"Assistant: {response3.choices[0].message.content}")
 
         print("\n✅ Multi-turn test completed")
@@ -5,6 +5,31 @@ import sys
 
 from common import get_client, get_model, print_log_hint, print_section
 
+_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather",
+            "description": "Get the current weather for a location",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "location": {
+                        "type": "string",
+                        "description": "The city and state, e.g. San Francisco, CA",
+                    },
+                    "unit": {
+                        "type": "string",
+                        "enum": ["celsius", "fahrenheit"],
+                        "description": "The temperature unit",
+                    },
+                },
+                "required": ["location"],
+            },
+        },
+    }
+]
+
 
 def test_tool_use() -> None:
     """Test tool use (function calling)."""
@@ -13,31 +38,6 @@ def test_tool_use() -> None:
     client = get_client()
     model = get_model()
 
-    tools = [
-        {
-            "type": "function",
-            "function": {
-                "name": "get_weather",
-                "description": "Get the current weather for a location",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "location": {
-                            "type": "string",
-                            "description": "The city and state, e.g. San Francisco, CA",
-                        },
-                        "unit": {
-                            "type": "string",
-                            "enum": ["celsius", "fahrenheit"],
-                            "description": "The temperature unit",
-                        },
-                    },
-                    "required": ["location"],
-                },
-            },
-        }
-    ]
-
     try:
         print("\nSending request with tools defined...")
         response = client.chat.completions.create(
@@ -48,7 +48,7 @@ def test_tool_use() -> None:
                     "content": "What's the weather like in Tokyo and Paris?",
                 }
             ],
-            tools=tools,
+            tools=_TOOLS,
         )
 
         message = response.choices[0].message
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import httpx
+
+from promptlens.config import CacheConfig
+
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:  # pragma: no cover
+    _blake3 = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+# Route types (as resolved by the proxy) whose responses may be cached.
+_CACHEABLE_ROUTES = frozenset({"chat", "completion"})
+# Fields that never influence the generated output.
+_NON_DETERMINING_FIELDS = frozenset({"stream", "stream_options", "user"})
+# Forwarded headers that identify the caller; responses are never shared
+# between different credentials.
+_IDENTITY_HEADERS = frozenset(
+    {
+        b"authorization",
+        b"api-key",
+        b"x-api-key",
+        b"openai-organization",
+        b"openai-project",
+    }
+)
+
+
+def _canonical_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), sort_keys=True
+    ).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    content: bytes
+    status_code: int
+    headers: httpx.Headers
+
+
+class ResponseCache:
+    def __init__(self, *, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, CachedResponse] = OrderedDict()
+
+    @classmethod
+    def from_config(cls, cfg: CacheConfig) -> Optional["ResponseCache"]:
+        if not cfg.enabled or cfg.max_entries <= 0:
+            return None
+        return cls(max_entries=cfg.max_entries)
+
+    def key_for(
+        self,
+        method: str,
+        request_path: str,
+        query: str,
+        content_type: str,
+        request_json: dict[str, Any] | None,
+        headers: list[tuple[bytes, bytes]],
+    ) -> Optional[bytes]:
+        if method != "POST" or request_json is None:
+            return None
+        if content_type not in _CACHEABLE_ROUTES:
+            return None
+        if request_json.get("stream") is True:
+            return None
+        if request_json.get("temperature") != 0:
+            return None
+        if request_json.get("tools") or request_json.get("functions"):
+            return None
+
+        canonical = {
+            k: v for k, v in request_json.items() if k not in _NON_DETERMINING_FIELDS
+        }
+        try:
+            encoded = _canonical_dumps([request_path, query, canonical])
+        except (TypeError, ValueError):
+            return None
+        identity = sorted(
+            (k.lower(), v) for k, v in headers if k.lower() in _IDENTITY_HEADERS
+        )
+        hasher = _blake3() if _blake3 is not None else hashlib.sha256()
+        hasher.update(encoded)
+        for name, value in identity:
+            hasher.update(b"\0" + name + b"\0" + value)
+        return hasher.digest()
+
+    def get(self, key: bytes) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: bytes, entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
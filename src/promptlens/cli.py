@@ -43,9 +43,11 @@ def cli(
         ),
     ] = None,
     log_dir: Annotated[
-        Path,
-        typer.Option("--log-dir", help="Directory to write JSONL logs."),
-    ] = _default_log_dir(),
+        Optional[Path],
+        typer.Option(
+            "--log-dir", help="Directory to write JSONL logs (default: ./logs)."
+        ),
+    ] = None,
     host: Annotated[str, typer.Option("--host", help="Bind host.")] = "127.0.0.1",
     port: Annotated[int, typer.Option("--port", help="Bind port.")] = 8000,
     llm_endpoint: Annotated[
@@ -115,40 +117,28 @@ def cli(
         )
 
     cfg: AppConfig = load_config(config_path) if config_path else AppConfig()
+    log_dir = log_dir or _default_log_dir()
 
+    upstream_overrides: dict[str, object] = {}
     if llm_endpoint is not None:
-        cfg = cfg.model_copy(
-            update={
-                "upstream": cfg.upstream.model_copy(update={"base_url": llm_endpoint})
-            }
-        )
+        upstream_overrides["base_url"] = llm_endpoint
     if timeout_s is not None:
-        cfg = cfg.model_copy(
-            update={
-                "upstream": cfg.upstream.model_copy(update={"timeout_s": timeout_s})
-            }
-        )
+        upstream_overrides["timeout_s"] = timeout_s
+
+    logging_overrides: dict[str, object] = {"log_dir": str(log_dir)}
     if max_log_file_bytes is not None:
-        cfg = cfg.model_copy(
-            update={
-                "logging": cfg.logging.model_copy(
-                    update={"max_file_bytes": max_log_file_bytes}
-                )
-            }
-        )
+        logging_overrides["max_file_bytes"] = max_log_file_bytes
     if max_prompt_bytes is not None:
-        cfg = cfg.model_copy(
-            update={
-                "logging": cfg.logging.model_copy(
-                    update={"max_prompt_bytes": max_prompt_bytes}
-                )
-            }
-        )
+        logging_overrides["max_prompt_bytes"] = max_prompt_bytes
+
+    updates: dict[str, object] = {
+        "logging": cfg.logging.model_copy(update=logging_overrides)
+    }
+    if upstream_overrides:
+        updates["upstream"] = cfg.upstream.model_copy(update=upstream_overrides)
+    cfg = cfg.model_copy(update=updates)
 
     log_dir.mkdir(parents=True, exist_ok=True)
-    cfg = cfg.model_copy(
-        update={"logging": cfg.logging.model_copy(update={"log_dir": str(log_dir)})}
-    )
 
     pid_path = pid_file or (log_dir / "plens.pid")
     with PidFile(pid_path):
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import tomllib
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Optional
 from urllib.parse import urlparse
@@ -12,6 +13,9 @@ class UpstreamConfig(BaseModel):
     base_url: str = "http://127.0.0.1:4000"
     timeout_s: float = 60.0
     verify_ssl: bool = True
+    http2: bool = False
+    max_conns: int = 100
+    max_keepalive: int = 100
     headers: dict[str, str] = Field(default_factory=dict)
 
     @field_validator("base_url")
@@ -32,6 +36,11 @@ class LoggingConfig(BaseModel):
     max_prompt_bytes: int = 256 * 1024
 
 
+class CacheConfig(BaseModel):
+    enabled: bool = False
+    max_entries: int = 1024
+
+
 class ServerConfig(BaseModel):
     log_level: str = "info"
 
@@ -39,15 +48,29 @@ class ServerConfig(BaseModel):
 class AppConfig(BaseModel):
     upstream: UpstreamConfig = Field(default_factory=UpstreamConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
     server: ServerConfig = Field(default_factory=ServerConfig)
 
 
+@dataclass(frozen=True, slots=True)
+class RuntimeConfig:
+    base_url: str
+    max_prompt_bytes: int
+
+    @classmethod
+    def from_app_config(cls, cfg: AppConfig) -> "RuntimeConfig":
+        return cls(
+            base_url=cfg.upstream.base_url,
+            max_prompt_bytes=cfg.logging.max_prompt_bytes,
+        )
+
+
 def _load_from_path(path: Path) -> dict[str, Any]:
     suffix = path.suffix.lower()
-    raw = path.read_bytes()
 
     if suffix == ".toml":
-        return tomllib.loads(raw.decode("utf-8"))
+        with path.open("rb") as f:
+            return tomllib.load(f)
 
     raise ValueError(f"Unsupported config type: {suffix} (supported: .toml)")
 
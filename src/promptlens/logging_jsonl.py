@@ -2,31 +2,61 @@ from __future__ import annotations
 
 import asyncio
 import json
+import logging
 import os
-from dataclasses import dataclass
+from contextlib import suppress
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
 from promptlens.config import LoggingConfig
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
 
-def _utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+_log = logging.getLogger(__name__)
+_UTC = timezone.utc
+_MAX_QUEUED_EVENTS = 10_000
+_MAX_BATCH_EVENTS = 256
 
 
-@dataclass(frozen=True)
-class LogWriteResult:
-    bytes_written: int
-    rotated: bool
-    path: Path
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_line(event: dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            event,
+            option=orjson.OPT_APPEND_NEWLINE
+            | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_UTC_Z,
+        )
+    return (
+        json.dumps(
+            event, ensure_ascii=False, separators=(",", ":"), default=_json_default
+        )
+        + "\n"
+    ).encode("utf-8")
 
 
 class JsonlLogger:
     def __init__(self, path: Path, *, max_file_bytes: int) -> None:
         self._path = path
         self._max_file_bytes = max_file_bytes
-        self._lock = asyncio.Lock()
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(
+            maxsize=_MAX_QUEUED_EVENTS
+        )
+        self._writer_task: asyncio.Task[None] | None = None
+        try:
+            self._size = path.stat().st_size
+        except FileNotFoundError:
+            self._size = 0
+        self._fd: int | None = None
 
     @classmethod
     def from_config(cls, cfg: LoggingConfig) -> "JsonlLogger":
@@ -38,64 +68,161 @@ class JsonlLogger:
     def path(self) -> Path:
         return self._path
 
-    async def write_event(self, event: dict[str, Any]) -> LogWriteResult:
-        event.setdefault("timestamp", _utc_now_iso())
-        line = (
-            json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
-        ).encode("utf-8")
-
-        async with self._lock:
-            rotated = await asyncio.to_thread(
-                self._rotate_if_needed, incoming_bytes=len(line)
-            )
-            bytes_written = await asyncio.to_thread(self._append_bytes, line)
-            return LogWriteResult(
-                bytes_written=bytes_written, rotated=rotated, path=self._path
-            )
+    def start(self) -> None:
+        """Start the background writer; write_event also starts it on demand."""
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._writer())
+
+    async def write_event(self, event: dict[str, Any]) -> None:
+        # Serialization happens on the writer thread, off the event loop.
+        event.setdefault("timestamp", datetime.now(_UTC))
+        self.start()
+        # Completes immediately unless the writer has fallen far behind.
+        await self._queue.put(event)
+
+    async def aclose(self) -> None:
+        """Flush queued events and stop the background writer."""
+        task = self._writer_task
+        if task is None:
+            return
+        await self._queue.join()
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        self._writer_task = None
+        self._close_fd()
+
+    async def _writer(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < _MAX_BATCH_EVENTS:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception:
+                # Keep the writer alive; the failed batch is dropped.
+                _log.exception(
+                    "Failed to write %d log event(s) to %s", len(batch), self._path
+                )
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list[dict[str, Any]]) -> None:
+        pending: list[bytes] = []
+        pending_bytes = 0
+        for event in batch:
+            try:
+                line = _dumps_line(event)
+            except (TypeError, ValueError):
+                _log.warning("Dropping unserializable log event", exc_info=True)
+                continue
+            if self._size + pending_bytes + len(line) > self._max_file_bytes:
+                if pending:
+                    self._append_lines(pending)
+                    pending.clear()
+                    pending_bytes = 0
+                self._rotate_if_needed(incoming_bytes=len(line))
+            pending.append(line)
+            pending_bytes += len(line)
+        if pending:
+            self._append_lines(pending)
 
     def _rotate_if_needed(self, *, incoming_bytes: int) -> bool:
-        try:
-            current = self._path.stat().st_size
-        except FileNotFoundError:
-            current = 0
-
-        if current + incoming_bytes <= self._max_file_bytes:
+        if self._size + incoming_bytes <= self._max_file_bytes:
             return False
 
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        timestamp = datetime.now(_UTC).strftime("%Y%m%d-%H%M%S")
         rotated_path = self._path.with_name(
             f"{self._path.stem}-{timestamp}{self._path.suffix}"
         )
         counter = 1
-        while rotated_path.exists():
-            rotated_path = self._path.with_name(
-                f"{self._path.stem}-{timestamp}-{counter}{self._path.suffix}"
-            )
-            counter += 1
-
-        if self._path.exists():
+        while True:
+            # Claim the target name atomically so concurrent rotations never collide.
+            try:
+                fd = os.open(rotated_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                rotated_path = self._path.with_name(
+                    f"{self._path.stem}-{timestamp}-{counter}{self._path.suffix}"
+                )
+                counter += 1
+            else:
+                os.close(fd)
+                break
+
+        self._close_fd()
+        try:
             self._path.replace(rotated_path)
+        except FileNotFoundError:
+            rotated_path.unlink(missing_ok=True)
+        self._size = 0
         return True
 
-    def _append_bytes(self, payload: bytes) -> int:
-        self._path.parent.mkdir(parents=True, exist_ok=True)
-        fd = os.open(self._path, os.O_APPEND | os.O_CREAT | os.O_WRONLY, 0o644)
-        try:
-            return os.write(fd, payload)
-        finally:
-            os.close(fd)
-
-
-def truncate_bytes(data: bytes, max_bytes: int) -> tuple[bytes, bool]:
+    def _open_fd(self) -> int:
+        if self._fd is None:
+            flags = os.O_APPEND | os.O_CREAT | os.O_WRONLY | os.O_CLOEXEC
+            try:
+                self._fd = os.open(self._path, flags, 0o644)
+            except FileNotFoundError:
+                # The log directory was removed after startup; recreate it.
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self._path, flags, 0o644)
+        return self._fd
+
+    def _close_fd(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _append_lines(self, lines: list[bytes]) -> None:
+        fd = self._open_fd()
+        iov: list[bytes | memoryview] = list(lines)
+        total = 0
+        while iov:
+            written = os.writev(fd, iov)
+            total += written
+            # Advance past fully written buffers and resume a partial one.
+            while iov and written >= len(iov[0]):
+                written -= len(iov[0])
+                iov.pop(0)
+            if iov and written:
+                iov[0] = memoryview(iov[0])[written:]
+        self._size += total
+
+
+def truncate_bytes(data: bytes, max_bytes: int) -> tuple[bytes | memoryview, bool]:
     if max_bytes <= 0:
         return b"", True
     if len(data) <= max_bytes:
         return data, False
-    return data[:max_bytes], True
+    # Zero-copy slice; callers decode straight from the view.
+    return memoryview(data)[:max_bytes], True
+
+
+def json_dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_fragment(encoded: bytes, obj: Any) -> Any:
+    """Embed already-encoded JSON in an event; ``obj`` is used without orjson."""
+    if orjson is not None:
+        return orjson.Fragment(encoded)
+    return obj
 
 
 def safe_json_loads(payload: bytes) -> Optional[Any]:
+    if orjson is not None:
+        try:
+            return orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            return None
     try:
         return json.loads(payload.decode("utf-8"))
-    except Exception:
+    except (UnicodeDecodeError, ValueError, RecursionError):
         return None
@@ -4,36 +4,91 @@ import atexit
 import os
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
 
 class PidFile:
     def __init__(self, path: Path) -> None:
         self._path = path
         self._pid = os.getpid()
+        self._fd: int | None = None
 
     def __enter__(self) -> "PidFile":
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        if self._path.exists():
-            existing = self._read_pid()
-            if existing is not None and _pid_is_running(existing):
-                raise RuntimeError(
-                    f"PID file exists and process appears running (pid={existing}): {self._path}"
-                )
-            self._path.unlink(missing_ok=True)
-
-        self._path.write_text(f"{self._pid}\n", encoding="utf-8")
+        if fcntl is not None:
+            self._fd = self._acquire_locked()
+        else:
+            self._acquire_exclusive()
+
         atexit.register(self._cleanup)
         return self
 
+    def _acquire_locked(self) -> int:
+        # The lock lives as long as this process and is dropped by the kernel
+        # when it exits, so a leftover file is reused rather than removed.
+        while True:
+            fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+            try:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise self._running_error(self._read_pid()) from None
+                # The holder may have removed the file between our open and lock.
+                try:
+                    current = os.stat(self._path)
+                except FileNotFoundError:
+                    current = None
+                if current is None or not os.path.samestat(os.fstat(fd), current):
+                    os.close(fd)
+                    continue
+                os.ftruncate(fd, 0)
+                os.write(fd, f"{self._pid}\n".encode("utf-8"))
+                return fd
+            except BaseException:
+                os.close(fd)
+                raise
+
+    def _acquire_exclusive(self) -> None:
+        while True:
+            try:
+                fd = os.open(self._path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                existing = self._read_pid()
+                # An empty file may belong to a process that has not written
+                # its pid yet, so only a dead pid counts as stale.
+                if existing is None or _pid_is_running(existing):
+                    raise self._running_error(existing)
+                self._path.unlink(missing_ok=True)
+                continue
+            try:
+                os.write(fd, f"{self._pid}\n".encode("utf-8"))
+            finally:
+                os.close(fd)
+            return
+
+    def _running_error(self, pid: int | None) -> RuntimeError:
+        return RuntimeError(
+            f"PID file exists and process appears running (pid={pid}): {self._path}"
+        )
+
     def __exit__(self, exc_type, exc, tb) -> None:
         self._cleanup()
+        atexit.unregister(self._cleanup)
 
     def _cleanup(self) -> None:
         try:
             self._path.unlink()
         except FileNotFoundError:
-            return
+            pass
         except Exception:
-            return
+            pass
+        # Unlink before unlocking so a waiter never locks a file being removed.
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
 
     def _read_pid(self) -> int | None:
         try:
@@ -46,6 +101,9 @@ class PidFile:
 def _pid_is_running(pid: int) -> bool:
     if pid <= 0:
         return False
+    if pid == os.getpid():
+        # A PID file naming us was left behind by an earlier process.
+        return False
     try:
         os.kill(pid, 0)
     except ProcessLookupError:
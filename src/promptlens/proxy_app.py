@@ -1,98 +1,126 @@
 from __future__ import annotations
 
-import json
-from contextlib import asynccontextmanager
+import re
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
 from typing import Any, AsyncIterator
 
 import httpx
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse, Response, StreamingResponse
 
-from promptlens.config import AppConfig
-from promptlens.logging_jsonl import JsonlLogger, safe_json_loads, truncate_bytes
+from promptlens.cache import CachedResponse, ResponseCache
+from promptlens.config import AppConfig, RuntimeConfig
+from promptlens.logging_jsonl import (
+    JsonlLogger,
+    json_dumps,
+    json_fragment,
+    safe_json_loads,
+    truncate_bytes,
+)
+
+_ROUTE_PATTERN = re.compile(
+    r"/(chat/completions|completions|embeddings|images|responses)(?=$|[/?])",
+    re.IGNORECASE,
+)
+# In priority order: when a path contains several route segments (e.g. Azure
+# deployment names), the highest-priority one wins, not the leftmost.
+_ROUTE_CONTENT_TYPES = {
+    "chat/completions": "chat",
+    "completions": "completion",
+    "embeddings": "embedding",
+    "images": "image",
+    "responses": "response",
+}
+_ROUTE_RANKS = {route: rank for rank, route in enumerate(_ROUTE_CONTENT_TYPES)}
 
 
-def _get_content_type(request_path: str, request_json: Any | None) -> str:
-    if not isinstance(request_json, dict):
+def _route_content_type(request_path: str) -> str:
+    routes = [m.group(1).lower() for m in _ROUTE_PATTERN.finditer(request_path)]
+    if not routes:
         return "unknown"
+    return _ROUTE_CONTENT_TYPES[min(routes, key=_ROUTE_RANKS.__getitem__)]
+
+
+HOP_BY_HOP_HEADERS = frozenset(
+    {
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailers",
+        "transfer-encoding",
+        "upgrade",
+    }
+)
 
-    lowered = request_path.lower()
-    if "/chat/completions" in lowered:
-        return "chat"
-    if "/completions" in lowered:
-        return "completion"
-    if "/embeddings" in lowered:
-        return "embedding"
-    if "/images/generations" in lowered or "/images" in lowered:
-        return "image"
-    if "/responses" in lowered:
-        return "response"
-
-    return "unknown"
-
-
-HOP_BY_HOP_HEADERS = {
-    "connection",
-    "keep-alive",
-    "proxy-authenticate",
-    "proxy-authorization",
-    "te",
-    "trailers",
-    "transfer-encoding",
-    "upgrade",
-}
-
-
-def _filter_headers(headers: httpx.Headers) -> list[tuple[str, str]]:
-    out: list[tuple[str, str]] = []
-    for k, v in headers.multi_items():
-        lk = k.lower()
-        if lk in HOP_BY_HOP_HEADERS or lk == "content-length":
-            continue
-        out.append((k, v))
-    return out
+# Starlette sets content-length and content-type (from media_type) itself.
+_EXCLUDED_RESP_HEADERS = frozenset(
+    name.encode("latin-1")
+    for name in HOP_BY_HOP_HEADERS | {"content-length", "content-type"}
+)
+_EXCLUDED_REQ_HEADERS = frozenset(
+    name.encode("latin-1") for name in HOP_BY_HOP_HEADERS | {"host", "content-length"}
+)
 
 
 def _apply_upstream_headers(
     response: Response, upstream_headers: httpx.Headers
 ) -> None:
-    for k, v in _filter_headers(upstream_headers):
-        if k.lower() == "set-cookie":
-            response.headers.append(k, v)
-        elif k.lower() == "content-type":
-            continue
-        else:
-            response.headers[k] = v
+    # Extend the raw header list once instead of mutating response.headers
+    # per header; duplicates such as set-cookie are kept as separate entries.
+    filtered: list[tuple[bytes, bytes]] = []
+    for k_raw, v_raw in upstream_headers.raw:
+        lk = k_raw.lower()
+        if lk not in _EXCLUDED_RESP_HEADERS:
+            filtered.append((lk, v_raw))
+    response.raw_headers.extend(filtered)
 
 
-def _filter_request_headers(request: Request) -> list[tuple[str, str]]:
-    out: list[tuple[str, str]] = []
+def _filter_request_headers(request: Request) -> list[tuple[bytes, bytes]]:
     # Use raw headers to preserve duplicates (dict(request.headers) drops them).
-    # Decode with latin-1 for a lossless, non-throwing byte-to-str mapping required by httpx.
-    for k_raw, v_raw in request.headers.raw:
-        k = k_raw.decode("latin-1")
-        v = v_raw.decode("latin-1")
-        lk = k.lower()
-        if lk in {"host", "content-length"}:
-            continue
-        out.append((k, v))
-    return out
-
-
-def _should_stream(request_json: Any | None) -> bool:
-    if not isinstance(request_json, dict):
+    # httpx accepts byte pairs, so survivors are forwarded without decoding.
+    return [
+        (k_raw, v_raw)
+        for k_raw, v_raw in request.headers.raw
+        if k_raw.lower() not in _EXCLUDED_REQ_HEADERS
+    ]
+
+
+def _as_dict(value: Any | None) -> dict[str, Any] | None:
+    return value if isinstance(value, dict) else None
+
+
+def _is_loggable_response(status_code: int, headers: httpx.Headers) -> bool:
+    return status_code < 400 and headers.get("content-type", "").startswith(
+        "application/json"
+    )
+
+
+def _unparsed_response(
+    content_type: str, status_code: int, headers: httpx.Headers
+) -> dict[str, Any]:
+    return {
+        "role": "assistant",
+        "type": content_type,
+        "status": status_code,
+        "content_type": headers.get("content-type"),
+    }
+
+
+def _should_stream(request_json: dict[str, Any] | None) -> bool:
+    if request_json is None:
         return False
-    return bool(request_json.get("stream") is True)
+    return request_json.get("stream") is True
 
 
 def _extract_user_input(
-    request_path: str, request_json: Any | None
+    content_type: str, request_json: dict[str, Any] | None
 ) -> dict[str, Any] | None:
-    if not isinstance(request_json, dict):
+    if request_json is None:
         return None
 
-    content_type = _get_content_type(request_path, request_json)
-    content = _extract_prompt(request_path, request_json)
+    content = _extract_prompt(content_type, request_json)
 
     return {
         "role": "user",
@@ -102,19 +130,16 @@ def _extract_user_input(
 
 
 def _extract_model_response(
-    response_json: Any | None, request_path: str
+    response_json: dict[str, Any] | None, content_type: str
 ) -> dict[str, Any] | None:
-    if not isinstance(response_json, dict):
+    if response_json is None:
         return None
 
-    content_type = _get_content_type(request_path, response_json)
     content = None
     tool_calls = None
     refusal = None
 
-    lowered = request_path.lower()
-
-    if "/chat/completions" in lowered:
+    if content_type == "chat":
         choices = response_json.get("choices", [])
         if choices and isinstance(choices, list):
             first_choice = choices[0]
@@ -124,17 +149,17 @@ def _extract_model_response(
                     content = message.get("content")
                     tool_calls = message.get("tool_calls")
                     refusal = message.get("refusal")
-    elif "/completions" in lowered:
+    elif content_type == "completion":
         choices = response_json.get("choices", [])
         if choices and isinstance(choices, list):
             first_choice = choices[0]
             if isinstance(first_choice, dict):
                 content = first_choice.get("text")
-    elif "/embeddings" in lowered:
+    elif content_type == "embedding":
         data = response_json.get("data", [])
         if data and isinstance(data, list):
             content = f"embedding with {len(data[0].get('embedding', []))} dimensions"
-    elif "/images" in lowered:
+    elif content_type == "image":
         data = response_json.get("data", [])
         if data and isinstance(data, list):
             first_item = data[0]
@@ -163,102 +188,108 @@ def _extract_model_response(
     return result
 
 
-def _parse_streaming_chat_completion(data: bytes) -> dict[str, Any] | None:
-    content_parts: list[str] = []
-    tool_calls_parts: dict[str, dict[str, Any]] = {}
-
-    try:
-        text = data.decode("utf-8", errors="ignore")
-    except Exception:
-        return None
-
-    for line in text.split("\n"):
-        line = line.strip()
-        if not line or not line.startswith("data: "):
-            continue
-
-        data_str = line[6:].strip()
-        if data_str == "[DONE]":
-            continue
-
-        try:
-            chunk = json.loads(data_str)
-        except Exception:
-            continue
+class SSEChatDecoder:
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+        self._content_parts: list[str] = []
+        self._tool_calls_parts: dict[str, dict[str, Any]] = {}
+
+    def feed(self, chunk: bytes) -> None:
+        buf = self._buffer
+        # Bytes already buffered hold no newline; only scan the new chunk so a
+        # long line split across many chunks is not rescanned from the start.
+        start = len(buf)
+        buf.extend(chunk)
+        pos = 0
+        nl = buf.find(b"\n", start)
+        while nl != -1:
+            self._handle_line(buf[pos:nl])
+            pos = nl + 1
+            nl = buf.find(b"\n", pos)
+        # Drop consumed lines in one shift instead of one per line.
+        if pos:
+            del buf[:pos]
+
+    def finalize(self) -> dict[str, Any] | None:
+        if self._buffer:
+            self._handle_line(self._buffer)
+            self._buffer.clear()
+
+        result: dict[str, Any] = {}
+        if self._content_parts:
+            result["content"] = "".join(self._content_parts)
+        if self._tool_calls_parts:
+            result["tool_calls"] = list(self._tool_calls_parts.values())
+
+        return result if result else None
+
+    def _handle_line(self, line: bytearray) -> None:
+        if not line.startswith(b"data: "):
+            return
+        payload = line[6:].strip()
+        if payload == b"[DONE]":
+            return
+        self._apply_chunk(safe_json_loads(payload))
 
+    def _apply_chunk(self, chunk: Any) -> None:
         if not isinstance(chunk, dict):
-            continue
+            return
 
         choices = chunk.get("choices", [])
-        if choices and isinstance(choices, list):
-            first_choice = choices[0]
-            if isinstance(first_choice, dict):
-                delta = first_choice.get("delta")
-                if isinstance(delta, dict):
-                    if "content" in delta and delta["content"]:
-                        content_parts.append(delta["content"])
-
-                    if "tool_calls" in delta:
-                        tool_calls_delta = delta["tool_calls"]
-                        if isinstance(tool_calls_delta, list):
-                            for tc in tool_calls_delta:
-                                if isinstance(tc, dict):
-                                    index = tc.get("index")
-                                    if index is not None:
-                                        idx_str = str(index)
-                                        if idx_str not in tool_calls_parts:
-                                            tool_calls_parts[idx_str] = {
-                                                "index": index,
-                                                "function": {},
-                                            }
-                                        tc_part = tool_calls_parts[idx_str]
-
-                                        if "id" in tc and tc["id"]:
-                                            tc_part["id"] = tc["id"]
-                                        if "type" in tc:
-                                            tc_part["type"] = tc["type"]
-
-                                        function = tc.get("function")
-                                        if isinstance(function, dict):
-                                            if "name" in function:
-                                                tc_part["function"]["name"] = (
-                                                    function.get("name")
-                                                )
-                                            if "arguments" in function:
-                                                func_args = tc_part["function"].get(
-                                                    "arguments", ""
-                                                )
-                                                tc_part["function"]["arguments"] = (
-                                                    func_args + function["arguments"]
-                                                )
-
-    result: dict[str, Any] = {}
-    if content_parts:
-        result["content"] = "".join(content_parts)
-    if tool_calls_parts:
-        result["tool_calls"] = list(tool_calls_parts.values())
-
-    return result if result else None
-
-
-def _extract_prompt(request_path: str, request_json: Any | None) -> Any | None:
-    if not isinstance(request_json, dict):
-        return None
+        if not choices or not isinstance(choices, list):
+            return
+        first_choice = choices[0]
+        if not isinstance(first_choice, dict):
+            return
+        delta = first_choice.get("delta")
+        if not isinstance(delta, dict):
+            return
 
-    lowered = request_path.lower()
-    if "/chat/completions" in lowered:
+        if "content" in delta and delta["content"]:
+            self._content_parts.append(delta["content"])
+
+        tool_calls_delta = delta.get("tool_calls")
+        if not isinstance(tool_calls_delta, list):
+            return
+        for tc in tool_calls_delta:
+            if not isinstance(tc, dict):
+                continue
+            index = tc.get("index")
+            if index is None:
+                continue
+            idx_str = str(index)
+            if idx_str not in self._tool_calls_parts:
+                self._tool_calls_parts[idx_str] = {"index": index, "function": {}}
+            tc_part = self._tool_calls_parts[idx_str]
+
+            if "id" in tc and tc["id"]:
+                tc_part["id"] = tc["id"]
+            if "type" in tc:
+                tc_part["type"] = tc["type"]
+
+            function = tc.get("function")
+            if isinstance(function, dict):
+                if "name" in function:
+                    tc_part["function"]["name"] = function.get("name")
+                if "arguments" in function:
+                    func_args = tc_part["function"].get("arguments", "")
+                    tc_part["function"]["arguments"] = func_args + function["arguments"]
+
+
+def _extract_prompt(content_type: str, request_json: dict[str, Any]) -> Any | None:
+    if content_type == "chat":
         return request_json.get("messages")
-    if "/responses" in lowered:
+    if content_type == "response":
         if "input" in request_json:
             return request_json.get("input")
         if "messages" in request_json:
             return request_json.get("messages")
         return None
-    if "/completions" in lowered:
+    if content_type == "completion":
         return request_json.get("prompt")
-    if "/embeddings" in lowered:
+    if content_type == "embedding":
         return request_json.get("input")
-    if "/images" in lowered:
+    if content_type == "image":
         return request_json.get("prompt")
 
     for key in ("messages", "input", "prompt"):
@@ -276,24 +307,32 @@ def _prompt_for_log(
         return None, False
 
     try:
-        encoded = json.dumps(prompt, ensure_ascii=False, separators=(",", ":")).encode(
-            "utf-8"
-        )
+        encoded = json_dumps(prompt)
+        is_json = True
     except Exception:
         encoded = str(prompt).encode("utf-8", "replace")
+        is_json = False
 
     if len(encoded) <= max_bytes:
-        return prompt, False
+        # Reuse the measurement encoding so the logger does not serialize twice.
+        return (json_fragment(encoded, prompt) if is_json else prompt), False
     truncated, _ = truncate_bytes(encoded, max_bytes)
-    return truncated.decode("utf-8", "replace"), True
+    return str(truncated, "utf-8", "replace"), True
 
 
 def create_app(cfg: AppConfig, logger: JsonlLogger) -> FastAPI:
+    runtime = RuntimeConfig.from_app_config(cfg)
+    cache = ResponseCache.from_config(cfg.cache)
+
     @asynccontextmanager
     async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        logger.start()
         existing = getattr(app.state, "http", None)
         if existing is not None:
-            yield
+            try:
+                yield
+            finally:
+                await logger.aclose()
             return
 
         timeout = httpx.Timeout(cfg.upstream.timeout_s)
@@ -301,11 +340,18 @@ def create_app(cfg: AppConfig, logger: JsonlLogger) -> FastAPI:
             timeout=timeout,
             verify=cfg.upstream.verify_ssl,
             headers=cfg.upstream.headers,
+            http2=cfg.upstream.http2,
+            limits=httpx.Limits(
+                max_connections=cfg.upstream.max_conns,
+                max_keepalive_connections=cfg.upstream.max_keepalive,
+                keepalive_expiry=60.0,
+            ),
         )
         try:
             yield
         finally:
             await app.state.http.aclose()
+            await logger.aclose()
 
     app = FastAPI(title="PromptLens Proxy", version="0.1.0", lifespan=lifespan)
 
@@ -315,57 +361,97 @@ def create_app(cfg: AppConfig, logger: JsonlLogger) -> FastAPI:
     )
     async def proxy(full_path: str, request: Request) -> Response:
         upstream_url = (
-            f"{cfg.upstream.base_url}/{full_path}"
-            if full_path
-            else cfg.upstream.base_url
+            runtime.base_url + "/" + full_path if full_path else runtime.base_url
         )
-        method = request.method.upper()
+        # Forward the query string exactly as received (already percent-encoded).
+        raw_query = request.url.query
+        if raw_query:
+            upstream_url += "?" + raw_query
+        # Route matching only admits the upper-case methods listed above.
+        method = request.method
         request_path = "/" + full_path if full_path else "/"
+        content_type = _route_content_type(request_path)
 
         body = await request.body()
-        req_json = safe_json_loads(body)
+        req_json = _as_dict(safe_json_loads(body))
         streaming = _should_stream(req_json)
 
-        user_input = _extract_user_input(request_path, req_json)
+        user_input = _extract_user_input(content_type, req_json)
         if user_input:
             input_for_log, input_truncated = _prompt_for_log(
-                prompt=user_input, max_bytes=cfg.logging.max_prompt_bytes
+                prompt=user_input, max_bytes=runtime.max_prompt_bytes
             )
             if input_for_log is not None:
+                # Enqueued inline so the input precedes its output in the log.
                 await logger.write_event(
                     {"input": input_for_log, "truncated": input_truncated}
                 )
 
         req_headers = _filter_request_headers(request)
-        query_params_for_upstream = list(request.query_params.multi_items())
 
         try:
             if streaming:
                 return await _proxy_streaming(
                     app=app,
-                    cfg=cfg,
+                    runtime=runtime,
                     logger=logger,
-                    request_path=request_path,
+                    content_type=content_type,
                     upstream_url=upstream_url,
                     method=method,
                     req_headers=req_headers,
-                    query_params_for_upstream=query_params_for_upstream,
                     body=body,
                 )
 
-            upstream_resp = await app.state.http.request(
-                method,
-                upstream_url,
-                params=query_params_for_upstream,
-                content=body if body else None,
-                headers=req_headers,
+            cache_key = (
+                cache.key_for(
+                    method,
+                    request_path,
+                    raw_query,
+                    content_type,
+                    req_json,
+                    req_headers,
+                )
+                if cache is not None
+                else None
             )
+            if cache_key is None:
+                return await _proxy_passthrough(
+                    app=app,
+                    runtime=runtime,
+                    logger=logger,
+                    content_type=content_type,
+                    upstream_url=upstream_url,
+                    method=method,
+                    req_headers=req_headers,
+                    body=body,
+                )
 
-            resp_json = safe_json_loads(upstream_resp.content)
-            model_response = _extract_model_response(resp_json, request_path)
+            entry = cache.get(cache_key)
+            if entry is None:
+                upstream_resp = await app.state.http.request(
+                    method,
+                    upstream_url,
+                    content=body if body else None,
+                    headers=req_headers,
+                )
+                entry = CachedResponse(
+                    content=upstream_resp.content,
+                    status_code=upstream_resp.status_code,
+                    headers=upstream_resp.headers,
+                )
+                if entry.status_code == 200:
+                    cache.put(cache_key, entry)
+
+            if _is_loggable_response(entry.status_code, entry.headers):
+                resp_json = _as_dict(safe_json_loads(entry.content))
+                model_response = _extract_model_response(resp_json, content_type)
+            else:
+                model_response = _unparsed_response(
+                    content_type, entry.status_code, entry.headers
+                )
             if model_response:
                 response_for_log, response_truncated = _prompt_for_log(
-                    prompt=model_response, max_bytes=cfg.logging.max_prompt_bytes
+                    prompt=model_response, max_bytes=runtime.max_prompt_bytes
                 )
                 if response_for_log is not None:
                     await logger.write_event(
@@ -373,93 +459,195 @@ def create_app(cfg: AppConfig, logger: JsonlLogger) -> FastAPI:
                     )
 
             resp = Response(
-                content=upstream_resp.content,
-                status_code=upstream_resp.status_code,
-                media_type=upstream_resp.headers.get("content-type"),
+                content=entry.content,
+                status_code=entry.status_code,
+                media_type=entry.headers.get("content-type"),
             )
-            _apply_upstream_headers(resp, upstream_resp.headers)
+            _apply_upstream_headers(resp, entry.headers)
             return resp
         except httpx.RequestError as exc:
-            return JSONResponse(
-                status_code=502,
-                content={
-                    "error": {
-                        "message": "Upstream request failed",
-                        "type": type(exc).__name__,
-                    }
-                },
-            )
+            return _upstream_error(exc)
 
     return app
 
 
-async def _proxy_streaming(
+def _upstream_error(exc: httpx.RequestError) -> JSONResponse:
+    return JSONResponse(
+        status_code=502,
+        content={
+            "error": {
+                "message": "Upstream request failed",
+                "type": type(exc).__name__,
+            }
+        },
+    )
+
+
+async def _open_upstream_stream(
     *,
     app: FastAPI,
-    cfg: AppConfig,
+    upstream_url: str,
+    method: str,
+    req_headers: list[tuple[bytes, bytes]],
+    body: bytes,
+) -> tuple[AbstractAsyncContextManager[httpx.Response], httpx.Response]:
+    # The caller owns the context manager and must exit it once the body
+    # has been consumed.
+    upstream_cm = app.state.http.stream(
+        method,
+        upstream_url,
+        content=body if body else None,
+        headers=req_headers,
+    )
+    return upstream_cm, await upstream_cm.__aenter__()
+
+
+async def _proxy_passthrough(
+    *,
+    app: FastAPI,
+    runtime: RuntimeConfig,
     logger: JsonlLogger,
-    request_path: str,
+    content_type: str,
     upstream_url: str,
     method: str,
-    req_headers: list[tuple[str, str]],
-    query_params_for_upstream: list[tuple[str, str]],
+    req_headers: list[tuple[bytes, bytes]],
     body: bytes,
 ) -> Response:
     try:
-        upstream_cm = app.state.http.stream(
-            method,
-            upstream_url,
-            params=query_params_for_upstream,
-            content=body if body else None,
-            headers=req_headers,
+        upstream_cm, upstream_resp = await _open_upstream_stream(
+            app=app,
+            upstream_url=upstream_url,
+            method=method,
+            req_headers=req_headers,
+            body=body,
         )
-        upstream_resp = await upstream_cm.__aenter__()
     except httpx.RequestError as exc:
-        return JSONResponse(
-            status_code=502,
-            content={
-                "error": {
-                    "message": "Upstream request failed",
-                    "type": type(exc).__name__,
-                }
-            },
+        return _upstream_error(exc)
+
+    # Only a bounded copy of a JSON body is kept for logging; the rest is
+    # forwarded to the client without being buffered.
+    loggable = _is_loggable_response(upstream_resp.status_code, upstream_resp.headers)
+    log_buf = bytearray()
+    overflowed = False
+
+    async def logging_iterator() -> AsyncIterator[bytes]:
+        nonlocal overflowed
+        try:
+            async for chunk in upstream_resp.aiter_bytes():
+                yield chunk
+                if loggable and not overflowed:
+                    remaining = runtime.max_prompt_bytes - len(log_buf)
+                    if len(chunk) > remaining:
+                        log_buf.extend(chunk[:remaining])
+                        overflowed = True
+                    else:
+                        log_buf.extend(chunk)
+        finally:
+            await upstream_cm.__aexit__(None, None, None)
+
+        try:
+            if not loggable or overflowed:
+                # A cut-off JSON body cannot be parsed; summarize it instead.
+                model_response: dict[str, Any] | None = _unparsed_response(
+                    content_type, upstream_resp.status_code, upstream_resp.headers
+                )
+            else:
+                model_response = _extract_model_response(
+                    _as_dict(safe_json_loads(log_buf)), content_type
+                )
+            if model_response:
+                response_for_log, response_truncated = _prompt_for_log(
+                    prompt=model_response, max_bytes=runtime.max_prompt_bytes
+                )
+                if response_for_log is not None:
+                    await logger.write_event(
+                        {
+                            "output": response_for_log,
+                            "truncated": response_truncated or overflowed,
+                        }
+                    )
+        except Exception:
+            pass
+
+    resp = StreamingResponse(
+        logging_iterator(),
+        status_code=upstream_resp.status_code,
+        media_type=upstream_resp.headers.get("content-type"),
+    )
+    _apply_upstream_headers(resp, upstream_resp.headers)
+    return resp
+
+
+async def _proxy_streaming(
+    *,
+    app: FastAPI,
+    runtime: RuntimeConfig,
+    logger: JsonlLogger,
+    content_type: str,
+    upstream_url: str,
+    method: str,
+    req_headers: list[tuple[bytes, bytes]],
+    body: bytes,
+) -> Response:
+    try:
+        upstream_cm, upstream_resp = await _open_upstream_stream(
+            app=app,
+            upstream_url=upstream_url,
+            method=method,
+            req_headers=req_headers,
+            body=body,
         )
+    except httpx.RequestError as exc:
+        return _upstream_error(exc)
 
     status_code = upstream_resp.status_code
-    accumulated_chunks: list[bytes] = []
+    # With a zero byte budget nothing of the body can be logged, so skip
+    # buffering and decoding; the output event is still written (truncated).
+    buffer_body = runtime.max_prompt_bytes > 0
+    accumulated = bytearray()
+    # Chat event streams are decoded as they arrive; anything else (including
+    # non-SSE error bodies) is kept raw and logged as text.
+    decoder = (
+        SSEChatDecoder()
+        if buffer_body
+        and content_type == "chat"
+        and upstream_resp.headers.get("content-type", "").startswith(
+            "text/event-stream"
+        )
+        else None
+    )
 
     async def iterator() -> AsyncIterator[bytes]:
         try:
             async for chunk in upstream_resp.aiter_raw():
                 yield chunk
-                accumulated_chunks.append(chunk)
+                if decoder is not None:
+                    decoder.feed(chunk)
+                elif buffer_body:
+                    accumulated.extend(chunk)
+        except Exception:
+            return
         finally:
             await upstream_cm.__aexit__(None, None, None)
 
-    async def logging_iterator() -> AsyncIterator[bytes]:
         try:
-            async for chunk in iterator():
-                yield chunk
-
-            full_bytes = b"".join(accumulated_chunks)
-            content_type = _get_content_type(request_path, None)
-
-            model_response = {
+            model_response: dict[str, Any] = {
                 "role": "assistant",
                 "type": content_type,
-                "content": full_bytes.decode("utf-8", errors="ignore"),
+                "content": None,
             }
-
-            if "/chat/completions" in request_path.lower():
-                parsed = _parse_streaming_chat_completion(full_bytes)
+            if decoder is not None:
+                parsed = decoder.finalize()
                 if parsed:
                     if "content" in parsed:
                         model_response["content"] = parsed["content"]
                     if "tool_calls" in parsed:
                         model_response["tool_calls"] = parsed["tool_calls"]
+            else:
+                model_response["content"] = accumulated.decode("utf-8", errors="ignore")
 
             response_for_log, response_truncated = _prompt_for_log(
-                prompt=model_response, max_bytes=cfg.logging.max_prompt_bytes
+                prompt=model_response, max_bytes=runtime.max_prompt_bytes
             )
             if response_for_log is not None:
                 await logger.write_event(
@@ -469,7 +657,7 @@ async def _proxy_streaming(
             pass
 
     resp = StreamingResponse(
-        logging_iterator(),
+        iterator(),
         status_code=status_code,
         media_type=upstream_resp.headers.get("content-type"),
     )